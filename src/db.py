@@ -1,4 +1,5 @@
-from elasticsearch import AsyncElasticsearch
+from elasticsearch import AsyncElasticsearch, ConflictError
+from elasticsearch.helpers import async_bulk, async_scan, async_streaming_bulk
 from .config import ELASTICSEARCH_URL
 from .models import IndexMetadata
 
@@ -69,4 +70,82 @@ class ElasticsearchClient:
             # 删除索引
             await es.indices.delete(index=index_name)
         except Exception as e:
-            raise Exception(f"Failed to delete index: {str(e)}") 
\ No newline at end of file
+            raise Exception(f"Failed to delete index: {str(e)}") 
+
+    @classmethod
+    async def bulk_create(cls, index_name: str, docs: list) -> tuple:
+        """
+        以create方式批量写入(uid, document)。
+        返回(实际写入的uid列表, 因uid已存在而跳过的uid列表, 失败条目列表)，
+        uid列表按输入顺序去重。
+        """
+        es = await cls.get_client()
+        actions = [
+            {"_op_type": "create", "_index": index_name, "_id": uid, "_source": doc}
+            for uid, doc in docs
+        ]
+        created, existing, failed = [], [], []
+        async for ok, result in async_streaming_bulk(
+            es, actions, raise_on_error=False, raise_on_exception=False
+        ):
+            info = result["create"]
+            if ok:
+                created.append(info["_id"])
+            elif info.get("status") == 409:
+                existing.append(info["_id"])
+            else:
+                failed.append({"uid": info.get("_id"), "error": str(info.get("error"))})
+        created = list(dict.fromkeys(created))
+        # 同一请求中重复提交的条目已被本次写入，不算作已存在
+        written = set(created)
+        existing = [uid for uid in dict.fromkeys(existing) if uid not in written]
+        return created, existing, failed
+
+    @classmethod
+    async def rekey_item(cls, index_name: str, uid: str, new_uid: str, doc: dict) -> str:
+        """
+        更新去重索引中的条目：内容哈希变化时将文档迁移到新uid并删除旧文档，
+        若新内容已存在则直接删除旧文档。返回更新后的uid。
+        """
+        es = await cls.get_client()
+        if new_uid == uid:
+            await es.update(index=index_name, id=uid, doc=doc)
+            return uid
+        if not await es.exists(index=index_name, id=uid):
+            raise Exception(f"Item {uid} not found")
+        try:
+            await es.create(index=index_name, id=new_uid, document=doc)
+        except ConflictError:
+            pass
+        await es.delete(index=index_name, id=uid)
+        return new_uid
+
+    @classmethod
+    async def scan_batches(cls, index_name: str, field: str, batch_size: int = 1000):
+        """分批遍历索引中所有文档，每批产出(uid列表, 字段值列表)"""
+        es = await cls.get_client()
+        uids, values = [], []
+        async for hit in async_scan(
+            es,
+            index=index_name,
+            query={"query": {"match_all": {}}},
+            _source=[field],
+            size=batch_size
+        ):
+            uids.append(hit["_id"])
+            values.append(hit["_source"].get(field, ""))
+            if len(uids) >= batch_size:
+                yield uids, values
+                uids, values = [], []
+        if uids:
+            yield uids, values
+
+    @classmethod
+    async def bulk_delete(cls, index_name: str, uids: list):
+        es = await cls.get_client()
+        actions = [
+            {"_op_type": "delete", "_index": index_name, "_id": uid}
+            for uid in uids
+        ]
+        # 重复项可能已被并发或重复的合并任务删除
+        await async_bulk(es, actions, ignore_status=(404,))
\ No newline at end of file
@@ -0,0 +1,186 @@
+"""
+内容去重：基于规范化内容哈希的确定性ID，以及基于MinHash/LSH的近似重复检测
+"""
+import re
+import uuid
+import zlib
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+# 确定性ID的命名空间，保证同一内容在任意进程中得到相同的uid
+DEDUP_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "kb_system/dedup")
+
+_WHITESPACE = re.compile(r"\s+")
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+_MAX_HASH = np.uint32(0xFFFFFFFF)
+
+
+def normalize_text(text: str) -> str:
+    # 自然语言字段：折叠所有空白
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def normalize_code(code: str) -> str:
+    # 代码字段：保留缩进，只统一换行并去掉行尾空白
+    lines = code.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip("\n")
+
+
+def content_uid(**fields: str) -> str:
+    """根据规范化后的字段内容生成确定性uid，格式与uuid4一致"""
+    parts = []
+    for key in sorted(fields):
+        value = fields[key]
+        value = normalize_code(value) if key == "code" else normalize_text(value)
+        parts.append(f"{key}\x1f{value}")
+    return str(uuid.uuid5(DEDUP_NAMESPACE, "\x1e".join(parts)))
+
+
+def shingle_hashes(code: str, k: int = 3) -> np.ndarray:
+    """将代码切分为词元k-gram，并哈希为uint32数组"""
+    tokens = _TOKEN.findall(normalize_code(code))
+    if not tokens:
+        return np.empty(0, dtype=np.uint32)
+    if len(tokens) < k:
+        shingles = [" ".join(tokens)]
+    else:
+        shingles = [" ".join(tokens[i:i + k]) for i in range(len(tokens) - k + 1)]
+    return np.unique(np.fromiter(
+        (zlib.crc32(s.encode("utf-8")) for s in shingles),
+        dtype=np.uint32,
+        count=len(shingles)
+    ))
+
+
+def minhash_signatures(
+    docs: Sequence[np.ndarray],
+    num_perm: int = 128,
+    seed: int = 1,
+    max_values: int = 1 << 22
+) -> np.ndarray:
+    """
+    批量计算MinHash签名，返回形状为(len(docs), num_perm)的uint32矩阵。
+    使用multiply-shift哈希族 h(x) = ((a * x + b) mod 2^64) >> 32。
+    按累计词元数分块，使每块的(num_perm, 词元数)中间矩阵不超过max_values个元素
+    （默认约32MB），超长文档再切片求最小值；中间结果原地计算。
+    空文档的签名全部为最大值。
+    """
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+    budget = max(1, max_values // num_perm)
+
+    def hash_values(values: np.ndarray) -> np.ndarray:
+        hashed = np.multiply(a[:, None], values.astype(np.uint64)[None, :])
+        np.add(hashed, b[:, None], out=hashed)
+        np.right_shift(hashed, np.uint64(32), out=hashed)
+        return hashed
+
+    signatures = np.full((len(docs), num_perm), _MAX_HASH, dtype=np.uint32)
+    lengths = np.fromiter((len(d) for d in docs), dtype=np.int64, count=len(docs))
+    nonempty = np.flatnonzero(lengths)
+    start = 0
+    while start < nonempty.size:
+        doc = nonempty[start]
+        if lengths[doc] > budget:
+            # 超长文档：逐片计算后取最小值
+            for offset in range(0, lengths[doc], budget):
+                part = hash_values(docs[doc][offset:offset + budget]).min(axis=1)
+                np.minimum(signatures[doc], part, out=signatures[doc], casting="unsafe")
+            start += 1
+            continue
+        # 在词元预算内尽量多放文档，遇到超长文档即截止
+        cumulative = np.cumsum(lengths[nonempty[start:]])
+        end = start + max(1, int(np.searchsorted(cumulative, budget, side="right")))
+        chunk = nonempty[start:end]
+        values = np.concatenate([docs[i] for i in chunk])
+        offsets = np.concatenate(([0], np.cumsum(lengths[chunk])[:-1]))
+        # 按(num_perm, 总词元数)布局，沿连续内存做分段最小值归约
+        signatures[chunk] = np.minimum.reduceat(hash_values(values), offsets, axis=1).T
+        start = end
+    return signatures
+
+
+def code_signatures(codes: Sequence[str], num_perm: int = 128) -> np.ndarray:
+    """计算一批代码的MinHash签名"""
+    return minhash_signatures([shingle_hashes(code) for code in codes], num_perm=num_perm)
+
+
+def lsh_clusters(signatures: np.ndarray, bands: int = 32, threshold: float = 0.9) -> np.ndarray:
+    """
+    对签名做LSH分桶，桶内与代表元素的估计Jaccard相似度不低于阈值时连边，
+    返回连通分量标签（分量内最小的文档下标）。
+    连通分量可能经由链式相似合并，调用方需再与保留项逐一校验。
+    """
+    n, num_perm = signatures.shape
+    if bands <= 0 or num_perm % bands != 0:
+        raise ValueError("num_perm must be divisible by bands")
+    rows = num_perm // bands
+
+    valid = ~np.all(signatures == _MAX_HASH, axis=1)
+    edges_u, edges_v = [], []
+    for band in range(bands):
+        block = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+        keys = block.view(np.dtype((np.void, block.dtype.itemsize * rows))).ravel()
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        rep = first[inverse.ravel()]
+        candidates = np.flatnonzero((rep != np.arange(n)) & valid)
+        if candidates.size == 0:
+            continue
+        similarity = (signatures[candidates] == signatures[rep[candidates]]).mean(axis=1)
+        keep = candidates[similarity >= threshold]
+        edges_u.append(keep)
+        edges_v.append(rep[keep])
+
+    labels = np.arange(n)
+    if not edges_u:
+        return labels
+    u = np.concatenate(edges_u)
+    v = np.concatenate(edges_v)
+    # 向量化的连通分量：最小标签传播 + 指针跳跃，直到收敛
+    while True:
+        previous = labels.copy()
+        np.minimum.at(labels, u, labels[v])
+        np.minimum.at(labels, v, labels[u])
+        labels = labels[labels]
+        if np.array_equal(labels, previous):
+            return labels
+
+
+def find_near_duplicates(
+    uids: Sequence[str],
+    signatures: np.ndarray,
+    bands: int = 32,
+    threshold: float = 0.9
+) -> List[Dict]:
+    """
+    返回近似重复簇列表，结果与扫描顺序无关。
+    每个连通分量内以uid最小的条目为保留项，只有与保留项本身的估计相似度
+    不低于阈值的条目才会列为重复项；剩余条目再以其中uid最小者为保留项
+    重复上述过程，直到不足两个条目。
+    """
+    if not uids:
+        return []
+    labels = lsh_clusters(signatures, bands=bands, threshold=threshold)
+
+    order = np.argsort(labels, kind="stable")
+    sorted_labels = labels[order]
+    starts = np.flatnonzero(np.r_[True, sorted_labels[1:] != sorted_labels[:-1]])
+    ends = np.r_[starts[1:], len(order)]
+    clusters = []
+    for start, end in zip(starts, ends):
+        if end - start < 2:
+            continue
+        remaining = np.array(sorted(order[start:end], key=lambda i: uids[i]))
+        while remaining.size >= 2:
+            survivor, others = remaining[0], remaining[1:]
+            similarity = (signatures[others] == signatures[survivor]).mean(axis=1)
+            matched = similarity >= threshold
+            if matched.any():
+                clusters.append({
+                    "keep": uids[survivor],
+                    "duplicates": [uids[i] for i in others[matched]]
+                })
+            remaining = others[~matched]
+    return clusters
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 from typing import List, Optional
 import uuid
 
@@ -34,6 +34,18 @@ class VectorSearchRequest(BaseModel):
     query_vector: List[float]
     top_k: int
 
+class NearDuplicateRequest(BaseModel):
+    threshold: float = Field(0.9, ge=0, le=1)
+    num_perm: int = Field(128, gt=0)
+    bands: int = Field(32, gt=0)
+    merge: bool = False  # 为True时删除每个簇中除保留项外的重复条目
+
+    @model_validator(mode="after")
+    def check_bands(self):
+        if self.num_perm % self.bands != 0:
+            raise ValueError("num_perm must be divisible by bands")
+        return self
+
 class IndexMetadata(BaseModel):
     name: str
     type: str  # predefined, history, task, retrieval 
\ No newline at end of file
@@ -1,8 +1,11 @@
 from fastapi import APIRouter, HTTPException
 from typing import List
 import uuid
-from ..models import RetrievalItem, VectorSearchRequest, IndexMetadata
+from elasticsearch import ConflictError
+from ..models import RetrievalItem, NearDuplicateRequest, VectorSearchRequest, IndexMetadata
 from ..db import ElasticsearchClient
+from ..dedup import content_uid
+from ..scan import scan_near_duplicates
 
 router = APIRouter()
 
@@ -63,21 +66,55 @@ async def create_retrieval_index(index_name: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/{index_name}/items")
-async def create_retrieval_item(index_name: str, item: RetrievalItem):
+async def create_retrieval_item(index_name: str, item: RetrievalItem, dedup: bool = False):
     es = await ElasticsearchClient.get_client()
     try:
         # 添加前缀
         prefixed_index_name = f"retrieval_{index_name}"
-        uid = str(uuid.uuid4())
-        await es.index(
-            index=prefixed_index_name,
-            id=uid,
-            document=item.model_dump()
-        )
+        if dedup:
+            # 去重模式：uid由规范化内容哈希得到，重复提交不会产生新条目
+            uid = content_uid(code=item.code, desc=item.desc)
+            try:
+                await es.create(
+                    index=prefixed_index_name,
+                    id=uid,
+                    document=item.model_dump()
+                )
+            except ConflictError:
+                return {"message": "Item already exists", "uid": uid}
+        else:
+            uid = str(uuid.uuid4())
+            await es.index(
+                index=prefixed_index_name,
+                id=uid,
+                document=item.model_dump()
+            )
         return {"message": "Item created successfully", "uid": uid}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/{index_name}/items/bulk")
+async def bulk_create_retrieval_items(index_name: str, items: List[RetrievalItem], dedup: bool = False):
+    try:
+        # 添加前缀
+        prefixed_index_name = f"retrieval_{index_name}"
+        docs = [
+            (
+                content_uid(code=item.code, desc=item.desc) if dedup else str(uuid.uuid4()),
+                item.model_dump()
+            )
+            for item in items
+        ]
+        created, existing, failed = await ElasticsearchClient.bulk_create(prefixed_index_name, docs)
+        return {
+            "message": "Some items failed" if failed else "Items created successfully",
+            "uids": created,
+            "existing": existing,
+            "failed": failed
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.delete("/{index_name}")
 async def delete_retrieval_index(index_name: str):
     es = await ElasticsearchClient.get_client()
@@ -101,17 +138,26 @@ async def delete_retrieval_item(index_name: str, uid: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.put("/{index_name}/items/{uid}")
-async def update_retrieval_item(index_name: str, uid: str, item: RetrievalItem):
+async def update_retrieval_item(index_name: str, uid: str, item: RetrievalItem, dedup: bool = False):
     es = await ElasticsearchClient.get_client()
     try:
         # 添加前缀
         prefixed_index_name = f"retrieval_{index_name}"
-        await es.update(
-            index=prefixed_index_name,
-            id=uid,
-            doc=item.model_dump()
-        )
-        return {"message": "Item updated successfully"}
+        if dedup:
+            # 去重模式：按新内容重新生成uid，保证uid始终与内容一致
+            uid = await ElasticsearchClient.rekey_item(
+                prefixed_index_name,
+                uid,
+                content_uid(code=item.code, desc=item.desc),
+                item.model_dump()
+            )
+        else:
+            await es.update(
+                index=prefixed_index_name,
+                id=uid,
+                doc=item.model_dump()
+            )
+        return {"message": "Item updated successfully", "uid": uid}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -142,4 +188,20 @@ async def vector_search(index_name: str, request: VectorSearchRequest):
             ]
         }
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e)) 
+
+@router.post("/{index_name}/near_duplicates")
+async def find_retrieval_near_duplicates(index_name: str, request: NearDuplicateRequest):
+    try:
+        # 添加前缀
+        prefixed_index_name = f"retrieval_{index_name}"
+        clusters = await scan_near_duplicates(
+            prefixed_index_name,
+            threshold=request.threshold,
+            num_perm=request.num_perm,
+            bands=request.bands,
+            merge=request.merge
+        )
+        return {"clusters": clusters, "merged": request.merge}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
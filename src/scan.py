@@ -0,0 +1,75 @@
+"""
+近似重复扫描：分批读取索引，在线程池中计算MinHash签名，避免阻塞事件循环。
+也可作为离线任务运行，将报告写入文件：
+
+    python -m src.scan retrieval my_index --output report.json [--merge]
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+
+from .db import ElasticsearchClient
+from .dedup import code_signatures, find_near_duplicates
+
+
+async def scan_near_duplicates(
+    index_name: str,
+    threshold: float = 0.9,
+    num_perm: int = 128,
+    bands: int = 32,
+    merge: bool = False,
+    batch_size: int = 1000
+) -> list:
+    # 只在内存中保留uid和签名，代码文本按批处理后即丢弃
+    uids, blocks = [], []
+    async for batch_uids, codes in ElasticsearchClient.scan_batches(index_name, "code", batch_size):
+        uids.extend(batch_uids)
+        blocks.append(await run_in_threadpool(code_signatures, codes, num_perm))
+    if not uids:
+        return []
+    signatures = np.concatenate(blocks)
+    clusters = await run_in_threadpool(find_near_duplicates, uids, signatures, bands, threshold)
+    if merge:
+        await ElasticsearchClient.bulk_delete(
+            index_name,
+            [uid for cluster in clusters for uid in cluster["duplicates"]]
+        )
+    return clusters
+
+
+async def main(argv=None):
+    parser = argparse.ArgumentParser(description="扫描知识库中的近似重复代码")
+    parser.add_argument("type", choices=["history", "retrieval"])
+    parser.add_argument("index_name")
+    parser.add_argument("--threshold", type=float, default=0.9)
+    parser.add_argument("--num-perm", type=int, default=128)
+    parser.add_argument("--bands", type=int, default=32)
+    parser.add_argument("--merge", action="store_true", help="删除每个簇中除保留项外的重复条目")
+    parser.add_argument("--output", help="报告文件路径，默认输出到标准输出")
+    args = parser.parse_args(argv)
+
+    try:
+        clusters = await scan_near_duplicates(
+            f"{args.type}_{args.index_name}",
+            threshold=args.threshold,
+            num_perm=args.num_perm,
+            bands=args.bands,
+            merge=args.merge
+        )
+    finally:
+        await ElasticsearchClient.close()
+
+    report = {"clusters": clusters, "merged": args.merge}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    else:
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
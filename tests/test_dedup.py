@@ -0,0 +1,124 @@
+import numpy as np
+
+from src.dedup import (
+    code_signatures,
+    content_uid,
+    find_near_duplicates,
+    lsh_clusters,
+    minhash_signatures,
+    normalize_code,
+    normalize_text,
+    shingle_hashes,
+)
+
+CODE = "def add(x, y):\n    total = x + y\n    return total\n" * 4
+
+
+def test_normalize_text_collapses_whitespace():
+    assert normalize_text("  hello\t\n world  ") == "hello world"
+
+
+def test_normalize_code_keeps_indentation():
+    assert normalize_code("\nif x:  \r\n    y = 1\t\r\n\n") == "if x:\n    y = 1"
+
+
+def test_content_uid_is_deterministic_and_normalized():
+    uid = content_uid(question="sum two numbers", code=CODE)
+    assert uid == content_uid(code=CODE, question="sum two numbers")
+    assert uid == content_uid(question=" sum  two\nnumbers ", code=CODE.replace("\n", "  \r\n"))
+    assert uid != content_uid(question="sum two numbers", code=CODE.replace("    ", "  "))
+    assert uid != content_uid(question="add two numbers", code=CODE)
+
+
+def test_content_uid_separates_fields():
+    assert content_uid(code="a", desc="b") != content_uid(code="ab", desc="")
+
+
+def test_shingle_hashes_empty_and_short():
+    assert shingle_hashes("").size == 0
+    assert shingle_hashes("  \n ").size == 0
+    assert shingle_hashes("x").size == 1
+
+
+def test_minhash_estimates_jaccard():
+    rng = np.random.default_rng(0)
+    universe = rng.choice(2 ** 32, size=3000, replace=False).astype(np.uint32)
+    first = np.sort(universe[:2000])
+    second = np.sort(universe[1000:])
+    signatures = minhash_signatures([first, second], num_perm=512)
+    estimate = (signatures[0] == signatures[1]).mean()
+    # 真实Jaccard为 1000 / 3000
+    assert abs(estimate - 1 / 3) < 0.06
+
+
+def test_minhash_chunking_does_not_change_result():
+    rng = np.random.default_rng(1)
+    docs = [
+        np.unique(rng.integers(0, 2 ** 32, size=size, dtype=np.uint32))
+        for size in (0, 5, 300, 40, 0, 1000, 7)
+    ]
+    expected = minhash_signatures(docs, num_perm=16, max_values=1 << 30)
+    chunked = minhash_signatures(docs, num_perm=16, max_values=16 * 64)
+    assert np.array_equal(expected, chunked)
+    assert np.all(expected[0] == 0xFFFFFFFF)
+    assert np.all(expected[4] == 0xFFFFFFFF)
+
+
+def test_lsh_clusters_merges_chains():
+    base = np.arange(8, dtype=np.uint32)
+    # A~B、B~C 各有6/8相同，A与C只有4/8相同
+    a = base.copy()
+    b = base.copy()
+    b[6:] = 100
+    c = base.copy()
+    c[4:] = 100
+    other = base + 1000
+    labels = lsh_clusters(np.stack([a, b, c, other]), bands=4, threshold=0.75)
+    assert list(labels) == [0, 0, 0, 3]
+
+
+def test_lsh_clusters_skips_empty_documents():
+    empty = np.full(8, 0xFFFFFFFF, dtype=np.uint32)
+    labels = lsh_clusters(np.stack([empty, empty]), bands=4, threshold=0.5)
+    assert list(labels) == [0, 1]
+
+
+def test_find_near_duplicates_verifies_against_survivor():
+    base = np.arange(8, dtype=np.uint32)
+    a = base.copy()
+    b = base.copy()
+    b[6:] = 100
+    c = base.copy()
+    c[4:] = 100
+    clusters = find_near_duplicates(["u2", "u1", "u3"], np.stack([b, a, c]), bands=4, threshold=0.75)
+    # 保留uid最小的条目；c与保留项的相似度不足阈值，不应被列为重复项
+    assert clusters == [{"keep": "u1", "duplicates": ["u2"]}]
+
+
+def test_find_near_duplicates_rechecks_leftover_members():
+    base = np.arange(8, dtype=np.uint32)
+    a = base.copy()
+    b = base.copy()
+    b[6:] = 100
+    c = base.copy()
+    c[4:] = 100
+    d = c.copy()
+    clusters = find_near_duplicates(["u1", "u2", "u3", "u4"], np.stack([a, b, c, d]), bands=4, threshold=0.75)
+    # c、d与保留项u1不够相似，但二者完全相同，应另成一簇
+    assert clusters == [
+        {"keep": "u1", "duplicates": ["u2"]},
+        {"keep": "u3", "duplicates": ["u4"]}
+    ]
+
+
+def test_find_near_duplicates_is_independent_of_scan_order():
+    codes = [CODE, CODE.replace("\n", "  \n"), "print('unrelated')", CODE + "# tail\n"]
+    uids = ["c", "a", "d", "b"]
+    clusters = find_near_duplicates(uids, code_signatures(codes), threshold=0.8)
+    reversed_clusters = find_near_duplicates(uids[::-1], code_signatures(codes[::-1]), threshold=0.8)
+    assert clusters == [{"keep": "a", "duplicates": ["b", "c"]}]
+    assert reversed_clusters == clusters
+
+
+def test_find_near_duplicates_empty():
+    assert find_near_duplicates([], np.empty((0, 128), dtype=np.uint32)) == []